@@ -1,15 +1,32 @@
 import os
+import stat
+import numpy as np
 import pandas as pd
 from flask import Flask, render_template, request, redirect, url_for, flash, send_file
 from io import BytesIO
-from fpdf import FPDF # 🚨 Corrected import for FPDF
+from functools import lru_cache
+from PIL import Image
+from python_calamine import CalamineError
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+from fpdf import FPDF, XPos, YPos # 🚨 Corrected import for FPDF
 from werkzeug.utils import secure_filename
 import zipfile 
+import tempfile
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # --- FLASK CONFIGURATION ---
 UPLOAD_FOLDER = 'uploads' 
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 SOURCE_COL = 'source' # Define the key column name once for consistency
+ZIP_SPOOL_MAX_BYTES = 64 * 1024 * 1024 # Larger report archives spill from memory to a temp file
+# Max PDF worker processes. Each one imports the whole app (~170 MB RSS) plus its image cache
+# and stays alive for reuse, so keep this small on memory-limited dynos
+REPORT_WORKERS = max(1, int(os.environ.get('REPORT_WORKERS', 2)))
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -27,40 +44,31 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def check_exactly_one_mismatch_or_missing(s1, s2):
+def near_mismatch_mask(anpr_plates, tc_plates):
     """
-    Checks for exactly one character difference (substitution) 
-    or one character length difference (insertion/deletion).
+    Flags plate pairs with exactly one character difference (substitution)
+    or one character length difference (insertion/deletion), i.e. a
+    Levenshtein distance of exactly 1.
+    Takes the two cleaned plate Series and returns a boolean NumPy mask.
     """
-    s1 = str(s1).strip()
-    s2 = str(s2).strip()
-
-    len1 = len(s1)
-    len2 = len(s2)
-
-    if s1 == s2:
-        return False
-
-    # 1. Check for exactly one substitution (same length)
-    if len1 == len2:
-        mismatches = 0
-        for i in range(len1):
-            if s1[i] != s2[i]:
-                mismatches += 1
-        return mismatches == 1
-
-    # 2. Check for exactly one insertion/deletion (length difference of 1)
-    if abs(len1 - len2) == 1:
-        if len1 < len2:
-            s1, s2 = s2, s1
-
-        for k in range(len(s1)):
-            temp_s1 = s1[:k] + s1[k+1:]
-            if temp_s1 == s2:
-                return True
-        return False
-        
-    return False
+    # Vectorised prefilter: only pairs that differ and are within one character
+    # in length (substitution or insertion/deletion) can be near-mismatches
+    len_a = anpr_plates.str.len().to_numpy(dtype=float, na_value=np.nan)
+    len_b = tc_plates.str.len().to_numpy(dtype=float, na_value=np.nan)
+    differs = (anpr_plates != tc_plates).to_numpy(dtype=bool, na_value=False)
+    candidates = (np.abs(len_a - len_b) <= 1) & differs
+
+    mask = np.zeros(len(candidates), dtype=bool)
+    if candidates.any():
+        # Pairwise distances for the whole batch in one native call, spread across all cores.
+        # With a cutoff of 1 rapidfuzz gives up at the second edit and returns 2
+        distances = process.cpdist(
+            anpr_plates.to_numpy()[candidates], tc_plates.to_numpy()[candidates],
+            scorer=Levenshtein.distance, score_cutoff=1, workers=-1
+        )
+        mask[candidates] = distances == 1
+
+    return mask
 
 def process_excel_data(file_stream):
     """
@@ -70,7 +78,12 @@ def process_excel_data(file_stream):
     try:
         # Re-seek the stream to the beginning to ensure pandas reads it correctly
         file_stream.seek(0) 
-        full_df = pd.read_excel(file_stream, sheet_name='Sheet1', header=0, engine='openpyxl')
+        # calamine (Rust) parses the workbook much faster than openpyxl. The whole sheet
+        # is still read; usecols only trims the DataFrame down to the report columns
+        full_df = pd.read_excel(
+            file_stream, sheet_name='Sheet1', header=0, engine='calamine',
+            usecols=lambda col: col == SOURCE_COL or col in COLUMNS_TO_KEEP
+        )
         
         # --- Column Definitions ---
         ANPR_COL = 'ANPR Plate Number' 
@@ -81,24 +94,22 @@ def process_excel_data(file_stream):
               raise ValueError(f"Excel missing required columns: **{ANPR_COL}**, **{TC_COL}**, or **{SOURCE_COL}**.")
 
         # --- Data Cleaning ---
-        full_df[ANPR_COL] = full_df[ANPR_COL].astype(str).str.strip().str.upper() 
-        full_df[TC_COL] = full_df[TC_COL].astype(str).str.strip().str.upper()
-        full_df[SOURCE_COL] = full_df[SOURCE_COL].astype(str).str.strip()
+        # Arrow-backed strings keep the text columns contiguous and the .str ops vectorised;
+        # missing plates stay <NA> and are never treated as near-mismatches
+        for col in (ANPR_COL, TC_COL):
+            full_df[col] = full_df[col].astype('string[pyarrow]').str.strip().str.upper()
+        full_df[SOURCE_COL] = full_df[SOURCE_COL].astype('string[pyarrow]').str.strip().fillna('')
+        if SEQUENCE_COL in full_df.columns:
+            full_df[SEQUENCE_COL] = full_df[SEQUENCE_COL].astype('string[pyarrow]').str.strip()
         
         # --- Filtering Logic ---
-        filter_mask = full_df.apply(
-            lambda row: check_exactly_one_mismatch_or_missing(
-                row[ANPR_COL], 
-                row[TC_COL]
-            ), 
-            axis=1
-        )
+        filter_mask = near_mismatch_mask(full_df[ANPR_COL], full_df[TC_COL])
         
         mismatch_df = full_df[filter_mask].copy() # Use .copy() to prevent SettingWithCopyWarning
         
         return mismatch_df, len(mismatch_df), full_df
     
-    except zipfile.BadZipFile as e:
+    except (zipfile.BadZipFile, CalamineError) as e:
         return None, f"File Error: The uploaded file is corrupted or not a valid Excel (.xlsx) file. Details: {e}", None
     except ValueError as e:
         return None, str(e), None
@@ -111,40 +122,79 @@ def process_excel_data(file_stream):
 IMAGE_HEIGHT_MM = 30 
 COL_WIDTHS = [25, 30, 25, 55, 60]
 COLUMNS_TO_KEEP = ['ANPR Sequence', 'ANPR Plate Number', 'TC_PLATE Number', 'image_path', 'vehicle_image']
+TEXT_COLS = tuple(COLUMNS_TO_KEEP[:3]) # Columns printed as text; the last two hold image paths
 SEQUENCE_COL = 'ANPR Sequence'
+IMAGE_DPI = 150 # Resolution images are downscaled to before embedding
+IMAGE_JPEG_QUALITY = 75
+
+@lru_cache(maxsize=4096)
+def load_cell_image(image_path, mtime, width_mm, height_mm):
+    """
+    Reads an image once, shrinks it to fit a width x height (mm) cell and caches
+    the re-encoded JPEG bytes. The file's mtime is part of the cache key so an
+    image replaced on disk is picked up again.
+    The cache is per process: the app process (single-report uploads) and each
+    long-lived report pool worker keep their own, reused across requests. Reports
+    rendered on different workers do not share entries.
+    """
+    target_size = (int(width_mm / 25.4 * IMAGE_DPI), int(height_mm / 25.4 * IMAGE_DPI))
+    with Image.open(image_path) as img:
+        img.thumbnail(target_size, Image.LANCZOS)
+        if img.has_transparency_data:
+            # JPEG has no alpha channel, so flatten transparent areas onto white
+            img = Image.alpha_composite(Image.new('RGBA', img.size, 'white'), img.convert('RGBA'))
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=IMAGE_JPEG_QUALITY)
+    return buffer.getvalue()
+
+def stat_image_files(paths):
+    """Returns {path: mtime} for the given paths that are existing files, with one stat call each."""
+    image_mtimes = {}
+    for path in paths:
+        try:
+            file_stat = os.stat(path)
+        except (OSError, ValueError):
+            continue
+        if stat.S_ISREG(file_stat.st_mode):
+            image_mtimes[path] = file_stat.st_mtime
+    return image_mtimes
 
 class ANPR_Report_PDF(FPDF):
     """Custom FPDF class for the ANPR Report layout, including summary data."""
     
-    def __init__(self, orientation='P', unit='mm', format='A4', report_title='ANPR Report', total_count=0, mismatch_count=0, zero_seq_count=0):
+    def __init__(self, orientation='P', unit='mm', format='A4', report_title='ANPR Report', total_count=0, mismatch_count=0, zero_seq_count=0, image_mtimes=None):
         super().__init__(orientation, unit, format)
         self.report_title = report_title
         self.total_count = total_count
         self.mismatch_count = mismatch_count
         self.zero_seq_count = zero_seq_count
+        self.image_mtimes = image_mtimes or {} # {path: mtime} for the image files that exist
 
     def header(self):
-        self.set_font('Arial', 'B', 15)
+        self.set_font('Helvetica', 'B', 15)
         title_text = f'Near-Mismatch Report: {self.report_title}'
-        self.cell(0, 10, title_text, 0, 1, 'C')
+        self.cell(0, 10, title_text, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
         self.ln(5)
 
     def footer(self):
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+        self.set_font('Helvetica', 'I', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', new_x=XPos.RIGHT, new_y=YPos.TOP, align='C')
 
     def print_header_row(self):
         self.set_fill_color(200, 220, 255) 
-        self.set_font('Arial', 'B', 10)
+        self.set_font('Helvetica', 'B', 10)
         
         headers = ['Sequence', 'ANPR Plate', 'TC Plate', 'Plate Image', 'Vehicle Image']
         for i, header in enumerate(headers):
-            self.cell(COL_WIDTHS[i], 10, header, 1, 0, 'C', 1)
+            self.cell(COL_WIDTHS[i], 10, header, border=1, new_x=XPos.RIGHT, new_y=YPos.TOP, align='C', fill=True)
         self.ln()
 
-    def add_data_row(self, data):
+    def add_data_row(self, text_data, image_path, vehicle_image):
         # ... (add_data_row logic: drawing cells and images)
+        # text_data holds the already-stringified TEXT_COLS values for the row
         global IMAGE_HEIGHT_MM, COL_WIDTHS
 
         if self.get_y() + IMAGE_HEIGHT_MM + 5 > self.page_break_trigger:
@@ -155,18 +205,15 @@ class ANPR_Report_PDF(FPDF):
         y_start = self.get_y()
         current_x = x_start
 
-        self.set_font('Arial', '', 10)
-        
-        text_data = [str(data.get(col, '')) for col in COLUMNS_TO_KEEP[:3]]
+        self.set_font('Helvetica', '', 10)
         
         for i, text in enumerate(text_data):
             self.set_xy(current_x, y_start)
-            self.multi_cell(COL_WIDTHS[i], IMAGE_HEIGHT_MM, text, 1, 'C', 0, 0) 
+            self.multi_cell(COL_WIDTHS[i], IMAGE_HEIGHT_MM, text, border=1, align='C') 
             current_x += COL_WIDTHS[i]
 
-        def insert_image_cell(path_key, col_index):
+        def insert_image_cell(image_path, col_index):
             nonlocal current_x, y_start
-            image_path = data.get(path_key)
             col_width = COL_WIDTHS[col_index]
 
             self.set_xy(current_x, y_start) 
@@ -174,72 +221,76 @@ class ANPR_Report_PDF(FPDF):
             
             # Simple image logic (assuming image is locally accessible via path)
             try:
-                if image_path and os.path.exists(image_path):
-                    self.image(image_path, x=current_x+2, y=y_start+2, w=col_width-4, h=IMAGE_HEIGHT_MM-4) 
+                if image_path in self.image_mtimes:
+                    image_bytes = load_cell_image(
+                        image_path, self.image_mtimes[image_path], col_width - 4, IMAGE_HEIGHT_MM - 4
+                    )
+                    self.image(BytesIO(image_bytes), x=current_x+2, y=y_start+2, w=col_width-4, h=IMAGE_HEIGHT_MM-4) 
                 else:
                     self.set_xy(current_x + 2, y_start + IMAGE_HEIGHT_MM / 2 - 2)
-                    self.set_font('Arial', 'I', 8)
-                    self.cell(col_width - 4, 4, 'Image Not Found', 0, 0, 'C')
-                    self.set_font('Arial', '', 10) 
+                    self.set_font('Helvetica', 'I', 8)
+                    self.cell(col_width - 4, 4, 'Image Not Found', new_x=XPos.RIGHT, new_y=YPos.TOP, align='C')
+                    self.set_font('Helvetica', '', 10) 
             except Exception:
                  self.set_xy(current_x + 2, y_start + IMAGE_HEIGHT_MM / 2 - 2)
-                 self.set_font('Arial', 'I', 8)
-                 self.cell(col_width - 4, 4, 'Image Load Error', 0, 0, 'C')
-                 self.set_font('Arial', '', 10)
+                 self.set_font('Helvetica', 'I', 8)
+                 self.cell(col_width - 4, 4, 'Image Load Error', new_x=XPos.RIGHT, new_y=YPos.TOP, align='C')
+                 self.set_font('Helvetica', '', 10)
 
             current_x += col_width
 
-        insert_image_cell('image_path', 3)  
-        insert_image_cell('vehicle_image', 4) 
+        insert_image_cell(image_path, 3)  
+        insert_image_cell(vehicle_image, 4) 
 
         self.set_xy(x_start, y_start + IMAGE_HEIGHT_MM)
     
     def print_summary(self):
         """Prints the summary statistics at the end of the report."""
         self.ln(10)
-        self.set_font('Arial', 'B', 12)
-        self.cell(0, 10, '--- Report Summary ---', 0, 1, 'L')
+        self.set_font('Helvetica', 'B', 12)
+        self.cell(0, 10, '--- Report Summary ---', new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L')
         
-        self.set_font('Arial', '', 10)
+        self.set_font('Helvetica', '', 10)
         
         # Line 1: Total Vehicles
-        self.cell(100, 7, 'Total Vehicles in this Source/Lane:', 1, 0, 'L')
-        self.cell(30, 7, str(self.total_count), 1, 1, 'C')
+        self.cell(100, 7, 'Total Vehicles in this Source/Lane:', border=1, new_x=XPos.RIGHT, new_y=YPos.TOP, align='L')
+        self.cell(30, 7, str(self.total_count), border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
         
         # Line 2: Vehicles with Zero/Unidentified Sequence
-        self.cell(100, 7, 'Vehicles with Zero/Unidentified Sequence:', 1, 0, 'L')
-        self.cell(30, 7, str(self.zero_seq_count), 1, 1, 'C') 
+        self.cell(100, 7, 'Vehicles with Zero/Unidentified Sequence:', border=1, new_x=XPos.RIGHT, new_y=YPos.TOP, align='L')
+        self.cell(30, 7, str(self.zero_seq_count), border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C') 
         
         # Line 3: Near Mismatches
-        self.cell(100, 7, 'Near-Mismatched Vehicles:', 1, 0, 'L')
-        self.cell(30, 7, str(self.mismatch_count), 1, 1, 'C')
+        self.cell(100, 7, 'Near-Mismatched Vehicles:', border=1, new_x=XPos.RIGHT, new_y=YPos.TOP, align='L')
+        self.cell(30, 7, str(self.mismatch_count), border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
         
         # Line 4: Mismatch Percentage
         if self.total_count > 0:
             percentage = (self.mismatch_count / self.total_count) * 100
-            self.set_font('Arial', 'B', 10)
-            self.cell(100, 7, 'Mismatch Percentage:', 1, 0, 'L')
-            self.cell(30, 7, f'{percentage:.2f}%', 1, 1, 'C')
-        self.set_font('Arial', '', 10)
+            self.set_font('Helvetica', 'B', 10)
+            self.cell(100, 7, 'Mismatch Percentage:', border=1, new_x=XPos.RIGHT, new_y=YPos.TOP, align='L')
+            self.cell(30, 7, f'{percentage:.2f}%', border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+        self.set_font('Helvetica', '', 10)
 
 
-def create_pdf_report(df_mismatch, df_full_source, source_name):
-    """Generates a single PDF report with summary statistics."""
+def create_pdf_report(df_mismatch, source_name, total_vehicles, zero_seq_count):
+    """
+    Generates a single PDF report with summary statistics.
+    total_vehicles and zero_seq_count are the precomputed counts for the whole source.
+    """
     
-    df_report = df_mismatch.reindex(columns=COLUMNS_TO_KEEP, fill_value='')
+    df_report = df_mismatch.reindex(columns=COLUMNS_TO_KEEP, fill_value='').fillna('')
 
     # Calculate summary counts for this specific source
-    total_vehicles = len(df_full_source)
     mismatch_vehicles = len(df_mismatch)
-    
-    # Calculate count for vehicles with zero/unidentified sequence
-    # Filter for 0 (as string/int), NaN, or empty string
-    zero_seq_count = df_full_source[
-        (df_full_source[SEQUENCE_COL].astype(str).str.strip() == '0') | 
-        (df_full_source[SEQUENCE_COL].isnull()) | 
-        (df_full_source[SEQUENCE_COL].astype(str).str.strip() == 'unidentified')
-    ].shape[0]
 
+    # Stringify each column once up front rather than each cell inside add_data_row
+    text_rows = df_report[list(TEXT_COLS)].astype(str).itertuples(index=False, name=None)
+    image_paths = df_report['image_path'].astype(str)
+    vehicle_images = df_report['vehicle_image'].astype(str)
+
+    # Stat each distinct image path once instead of probing the filesystem per row
+    image_mtimes = stat_image_files(set(image_paths) | set(vehicle_images))
     
     # Initialize PDF object, passing the counts
     pdf = ANPR_Report_PDF(
@@ -247,7 +298,8 @@ def create_pdf_report(df_mismatch, df_full_source, source_name):
         report_title=source_name,
         total_count=total_vehicles,
         mismatch_count=mismatch_vehicles,
-        zero_seq_count=zero_seq_count
+        zero_seq_count=zero_seq_count,
+        image_mtimes=image_mtimes
     )
     pdf.set_auto_page_break(False, margin=15)
     pdf.add_page()
@@ -255,12 +307,8 @@ def create_pdf_report(df_mismatch, df_full_source, source_name):
     pdf.print_header_row()
     
     # Process rows
-    for index, row in df_report.iterrows():
-        row_dict = row.to_dict()
-        row_dict['image_path'] = str(row_dict.get('image_path', ''))
-        row_dict['vehicle_image'] = str(row_dict.get('vehicle_image', ''))
-
-        pdf.add_data_row(row_dict)
+    for text_data, image_path, vehicle_image in zip(text_rows, image_paths, vehicle_images):
+        pdf.add_data_row(text_data, image_path, vehicle_image)
 
     # Print the summary
     if pdf.get_y() + 50 > pdf.page_break_trigger:
@@ -268,7 +316,56 @@ def create_pdf_report(df_mismatch, df_full_source, source_name):
          
     pdf.print_summary()
 
-    return pdf.output(dest='S')
+    return bytes(pdf.output())
+
+
+# --- REPORT WORKER POOL ---
+
+_report_pool = None
+_report_pool_lock = threading.Lock()
+
+def get_report_pool():
+    """
+    Returns the process pool used to render PDF reports, creating it on first use.
+    The pool lives as long as the app process, so its workers (and their image cache)
+    are reused across requests. Workers are started with forkserver/spawn because
+    forking a multi-threaded server such as waitress can deadlock the child.
+
+    Workers are only started when submitted reports find no idle one, so a request
+    never starts more than its number of reports, and the pool never holds more than
+    REPORT_WORKERS (capped at the core count). Started workers are kept, so the
+    steady-state memory cost is up to REPORT_WORKERS x one app import (~170 MB each).
+    """
+    global _report_pool
+    with _report_pool_lock:
+        if _report_pool is None:
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _report_pool = ProcessPoolExecutor(
+                max_workers=min(REPORT_WORKERS, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _report_pool
+
+def discard_report_pool(broken_pool):
+    """
+    Drops a broken report pool so the next request starts a fresh one.
+    Only clears the shared pool if it is still broken_pool, so a late caller
+    never shuts down a healthy pool created after the breakage.
+    """
+    global _report_pool
+    with _report_pool_lock:
+        if _report_pool is broken_pool:
+            _report_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_report_pool():
+    """Shuts down whichever report pool is current when the app process exits."""
+    with _report_pool_lock:
+        pool = _report_pool
+    if pool is not None:
+        pool.shutdown()
+
+atexit.register(shutdown_report_pool)
 
 
 # --- FLASK ROUTES ---
@@ -294,6 +391,7 @@ def upload_file():
         return redirect(url_for('index'))
 
     if file and allowed_file(file.filename):
+        report_pool = None # Set once the shared pool is used, so a breakage discards that exact pool
         try:
             # 1. Process data: returns mismatch_df, count (or error), and full_df
             mismatch_df, count, full_df = process_excel_data(file.stream)
@@ -307,35 +405,61 @@ def upload_file():
                 flash('✅ File processed successfully! No near-mismatches found.', 'success')
                 return redirect(url_for('index'))
             
-            # 3. Group filtered and full dataframes by 'source'
+            # 3. Group filtered dataframe by 'source' and count the full data per source
             mismatch_groups = mismatch_df.groupby(SOURCE_COL)
-            full_groups = full_df.groupby(SOURCE_COL)
             
-            # Create an in-memory ZIP file container
-            zip_buffer = BytesIO()
-            total_pdf_count = 0
+            # Count vehicles with zero/unidentified sequence
+            # Filter for 0 (as string/int), NaN, or 'unidentified' in a single pass
+            # (process_excel_data has already converted the sequences to stripped strings)
+            sequence = full_df[SEQUENCE_COL]
+            zero_seq = sequence.isna() | sequence.isin(['0', 'unidentified'])
+            total_by_source = full_df.groupby(SOURCE_COL, sort=False).size().to_dict()
+            zero_seq_by_source = zero_seq.groupby(full_df[SOURCE_COL], sort=False).sum().to_dict()
             
-            with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zf:
+            # Collect the per-source report jobs; only the counts of the full data are needed
+            report_jobs = []
+            for source_name, mismatch_group_df in mismatch_groups:
                 
-                for source_name, mismatch_group_df in mismatch_groups:
-                    
-                    # Get the corresponding full data for the current source
-                    # This is used for the "Total Vehicles" count in the summary
-                    full_group_df = full_groups.get_group(source_name) 
-                    
-                    if not source_name or str(source_name).strip().lower() == 'nan':
-                        source_name = "UNSPECIFIED_SOURCE"
+                # These are used for the "Total Vehicles" and zero-sequence counts in the summary
+                total_vehicles = int(total_by_source[source_name])
+                zero_seq_count = int(zero_seq_by_source[source_name])
+                
+                if not source_name or str(source_name).strip().lower() == 'nan':
+                    source_name = "UNSPECIFIED_SOURCE"
+
+                report_jobs.append((mismatch_group_df, source_name, total_vehicles, zero_seq_count))
 
-                    # Generate the PDF for this group
-                    pdf_bytes = create_pdf_report(mismatch_group_df, full_group_df, source_name)
+            # ZIP container that stays in memory until it outgrows ZIP_SPOOL_MAX_BYTES, then spills to disk
+            zip_buffer = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_BYTES)
+            total_pdf_count = 0
+            
+            try:
+                # PDF streams are already compressed, so store them without re-deflating
+                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zf:
+                    if len(report_jobs) == 1:
+                        # A single report is rendered inline; a worker would only add pickling overhead
+                        pdf_reports = [create_pdf_report(*report_jobs[0])]
+                    else:
+                        # Generate the PDFs in parallel on the shared worker pool.
+                        # Each PDF is written as soon as it is ready instead of holding them all first
+                        report_pool = get_report_pool()
+                        pdf_reports = report_pool.map(create_pdf_report, *zip(*report_jobs))
+                
+                    for (_, source_name, _, _), pdf_bytes in zip(report_jobs, pdf_reports):
                     
-                    # Add the PDF to the ZIP file
-                    safe_source_name = secure_filename(source_name) 
-                    pdf_filename = f"ANPR_Report_{safe_source_name}.pdf"
+                        # Add the PDF to the ZIP file
+                        safe_source_name = secure_filename(source_name) 
+                        pdf_filename = f"ANPR_Report_{safe_source_name}.pdf"
                     
-                    zf.writestr(pdf_filename, pdf_bytes)
-                    total_pdf_count += 1
+                        zf.writestr(pdf_filename, pdf_bytes)
+                        total_pdf_count += 1
+            except Exception:
+                # Don't leave the (possibly already on-disk) spooled archive behind on failure
+                zip_buffer.close()
+                raise
             
+            # SpooledTemporaryFile gives send_file no size, so Content-Length is set explicitly
+            zip_length = zip_buffer.tell()
             zip_buffer.seek(0)
             
             # 4. Return the ZIP file for download
@@ -344,12 +468,20 @@ def upload_file():
 
             flash(f'✅ Found **{count}** total near-mismatches, grouped into **{total_pdf_count}** reports. Downloading ZIP file.', 'success')
             
-            return send_file(
+            response = send_file(
                 zip_buffer,
                 mimetype='application/zip',
                 as_attachment=True,
                 download_name=output_zip_filename
             )
+            response.content_length = zip_length
+            return response
+
+        except BrokenProcessPool as e:
+            if report_pool is not None:
+                discard_report_pool(report_pool)
+            flash(f'An unexpected error occurred during report generation: {e}', 'error')
+            return redirect(url_for('index'))
 
         except Exception as e:
             flash(f'An unexpected error occurred during processing or report generation: {e}', 'error')